@@ -1,9 +1,18 @@
+'''Initialize Flask app.'''
 import os
+import decimal
+import datetime
 
-'''Initialize Flask app.'''
-from flask import Flask
+from threading import Lock
+
+import orjson
+
+from flask import Flask, current_app
 from flask.app import Flask
 from flask.config import Config
+from flask.json.provider import JSONProvider
+from werkzeug.http import http_date
+from assasdb import AssasDatabaseManager
 
 class AttrConfig(Config):
     def __getattr__(self, key):
@@ -17,8 +26,49 @@ class AttrConfig(Config):
         out.update(super().__dir__())
         return sorted(out)
 
+class OrjsonProvider(JSONProvider):
+    '''Encode the JSON responses with orjson, NumPy arrays and scalars are serialized natively.'''
+    
+    # dates are passed through to default and keep the HTTP date format of flask, orjson writes ISO 8601
+    options = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+    
+    @staticmethod
+    def default(obj):
+        # the types orjson does not know, handled like the default provider of flask
+        if isinstance(obj, datetime.date):
+            return http_date(obj)
+        if isinstance(obj, decimal.Decimal):
+            return str(obj)
+        if hasattr(obj, '__html__'):
+            return str(obj.__html__())
+        raise TypeError(f'Object of type {type(obj).__name__} is not JSON serializable')
+    
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj, default=self.default, option=self.options).decode()
+    
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
 class CustomFlask(Flask):
     config_class = AttrConfig
+    json_provider_class = OrjsonProvider
+
+database_manager_lock = Lock()
+
+def get_database_manager():
+    '''Return the database manager of the current app, created on first use and shared by all requests.'''
+    
+    manager = current_app.extensions.get('assas_database_manager')
+    
+    if manager is None:
+        # concurrent first requests would each open a client, only one is created under the lock
+        with database_manager_lock:
+            manager = current_app.extensions.get('assas_database_manager')
+            if manager is None:
+                manager = AssasDatabaseManager(current_app.config)
+                current_app.extensions['assas_database_manager'] = manager
+    
+    return manager
 
 def init_app():
     '''Construct core Flask application with embedded Dash app.'''
@@ -0,0 +1,12 @@
+// clientside callbacks of the database page, they only map the selected page
+// and need no round trip to the server
+window.dash_clientside = Object.assign({}, window.dash_clientside, {
+    database: {
+        change_page: function(page, value) {
+            return 'Page selected: ' + (page ? page : 1) + '/' + value;
+        },
+        change_page_table: function(page) {
+            return page ? page - 1 : 0;
+        }
+    }
+});
@@ -1,18 +1,24 @@
 import os
+import re
 import dash
 import dash_bootstrap_components as dbc
 import pandas as pd
 import numpy as np
 import logging
+import time
+import shutil
 
-from dash import Dash, dash_table, html, dcc, Input, Output, callback, State
+from collections import OrderedDict
+from functools import lru_cache
+from operator import eq, ne, lt, le, gt, ge
+from threading import Lock
+from dash import dash_table, html, dcc, Input, Output, callback, clientside_callback, ClientsideFunction, State
 from flask import current_app as flask_app
-from zipfile import ZipFile
+from zipfile import ZipFile, ZipInfo, ZIP_STORED, ZIP_DEFLATED
 from uuid import uuid4
-from pathlib import Path
 
-from assasdb import AssasDatabaseManager
 from ..components import content_style, conditional_table_style
+from ... import get_database_manager
 
 logger = logging.getLogger('assas_app')
 
@@ -30,129 +36,290 @@ operators = [['ge ', '>='],
              ['contains '],
              ['datestartswith ']]
 
-table_data = AssasDatabaseManager(flask_app.config).get_all_database_entries()
+# maps every spelling of an operator to the first entry of its operator type
+OPERATOR_NAMES = {
+    operator.strip(): operator_type[0].strip()
+    for operator_type in operators
+    for operator in operator_type
+}
+
+# single pass over a filter part, longest operators first so that '>=' wins over '>',
+# word operators need a space after them in the filter string, the optional s or i
+# prefix of the table selects a case-sensitive or case-insensitive comparison
+FILTER_PATTERN = re.compile(
+    r'\{(?P<name>[^}]*)\}\s*(?P<case>[si]?)(?P<operator>%s)(?P<value>.*)$' % '|'.join(
+        re.escape(operator.strip()) + (r'(?=\s)' if operator.endswith(' ') else '')
+        for operator in sorted(sum(operators, []), key=len, reverse=True)
+    ),
+    re.DOTALL
+)
+
+COMPARISON_OPERATORS = {
+    'eq': eq,
+    'ne': ne,
+    'lt': lt,
+    'le': le,
+    'gt': gt,
+    'ge': ge,
+}
+
+# rough relative cost of evaluating a clause, used to order the clauses of a filter query
+FILTER_COSTS = {
+    'eq': 1,
+    'ne': 1,
+    'lt': 2,
+    'le': 2,
+    'gt': 2,
+    'ge': 2,
+    'datestartswith': 5,
+    'contains': 10,
+}
+
+TABLE_COLUMNS = [
+    {'name': '_id', 'id': '_id', 'hideable': True},
+    {'name': 'Uuid', 'id': 'system_uuid', 'hideable': True},
+    {'name': 'Upload Uuid', 'id': 'system_upload_uuid', 'hideable': True},
+    {'name': 'Path', 'id': 'system_path', 'hideable': True},
+    {'name': 'Result', 'id': 'system_result', 'hideable': True},
+    {'name': 'Index', 'id': 'system_index', 'selectable': True},
+    {'name': 'Size', 'id': 'system_size', 'selectable': True},
+    {'name': 'Size hdf5', 'id': 'system_size_hdf5', 'selectable': True},
+    {'name': 'Date', 'id': 'system_date', 'selectable': True},
+    {'name': 'User', 'id': 'system_user', 'selectable': True},
+    {'name': 'File', 'id': 'system_download', 'selectable': True},
+    {'name': 'Status', 'id': 'system_status', 'selectable': True},
+    {'name': 'Name', 'id': 'meta_name', 'selectable': True},
+]
+
+# low-cardinality columns, kept as categoricals so filters and sorts work on integer codes
+CATEGORY_COLUMNS = ['system_status', 'system_user', 'system_download']
+
+# text columns holding dates in the format they are stored with, datestartswith
+# clauses with an ISO date prefix compare their parsed distinct values
+DATE_COLUMNS = {'system_date': '%m/%d/%Y, %H:%M:%S'}
+DATE_PREFIX_PATTERN = re.compile(r'\d{4}(-\d{2}(-\d{2})?)?$')
+
+FILTER_CACHE_SIZE = 32
+
+class TableState:
+    '''Loaded table and the data derived from it, replaced as a whole on reload.'''
+    
+    def __init__(
+        self,
+        dataframe
+    ):
+        
+        self.dataframe = dataframe
+        # codes and distinct values of the text columns
+        self.factorized = {}
+        # parsed distinct values of the date columns
+        self.dates = {}
+        # row positions per filter query, and per query and sort columns
+        self.positions = OrderedDict()
+
+def load_table_data():
+    
+    # the manager of the app is shared, so its client and connection pool are reused by every reload
+    table_data = get_database_manager().get_all_database_entries()
+    
+    # keep only the fields the table declares, every other field would be
+    # held in memory and shipped with each row to the browser
+    table_data = table_data[[column['id'] for column in TABLE_COLUMNS if column['id'] in table_data.columns]]
+    
+    for column in CATEGORY_COLUMNS:
+        if column in table_data.columns:
+            table_data[column] = table_data[column].astype('category')
+    
+    # the remaining text columns are stored in contiguous Arrow buffers
+    for column in table_data.select_dtypes('object').columns:
+        if pd.api.types.infer_dtype(table_data[column], skipna=True) == 'string':
+            table_data[column] = table_data[column].astype('string[pyarrow]')
+    
+    return table_data
+
+# shared by all callbacks of this worker
+table_cache = {'data': None, 'time': 0.0}
+table_cache_lock = Lock()
+
+def get_table_state(
+    reload=False
+):
+    
+    with table_cache_lock:
+        
+        age = time.monotonic() - table_cache['time']
+        
+        if reload or table_cache['data'] is None or age > flask_app.config.get('TABLE_DATA_TTL', 300):
+            table_cache['data'] = TableState(load_table_data())
+            table_cache['time'] = time.monotonic()
+            logger.debug('loaded table data with %s entries', len(table_cache['data'].dataframe))
+        
+        return table_cache['data']
+
+def get_table_data(
+    reload=False
+):
+    
+    return get_table_state(reload).dataframe
 
-ALL = len(table_data)
 PAGE_SIZE = 30
 PAGE_MAX_SIZE = 100
 
-PAGE_COUNT = ALL / PAGE_SIZE
+def page_count(
+    entries,
+    page_size
+):
+    
+    # integer ceiling division, an empty table still shows one page
+    return max((entries + page_size - 1) // page_size, 1)
+
+# styles of the entries per page input, shared by the layout and update_page_size_style
+PAGE_SIZE_STYLE_ACTIVE = {'color': 'black'}
+PAGE_SIZE_STYLE_INACTIVE = {'color': 'grey'}
+
+# styles of the layout containers, shared and never modified
+PAGINATION_STYLE = {'width': '100%','padding-left':'30%', 'padding-right':'25%'}
+CONTROLS_STYLE = {'width': '100%','padding-left':'10%', 'padding-right':'25%'}
+
+# literal properties of the DataTable, built once at import instead of on every layout() call
+TABLE_MARKDOWN_OPTIONS = {'html': True}
+TABLE_HIDDEN_COLUMNS = ['', '_id', 'system_uuid', 'system_upload_uuid', 'system_path', 'system_result']
+TABLE_CELL_STYLE = {
+    'fontSize': 17,
+    'padding': '2px',
+    'textAlign': 'center'
+}
+TABLE_HEADER_STYLE = {
+    'backgroundColor': 'black',
+    'color': 'white',
+    'fontWeight': 'bold'
+}
+TABLE_DATA_STYLE = {
+    'backgroundColor': 'black',
+    'color': 'white'
+}
+TABLE_CONDITIONAL_STYLE = conditional_table_style()
 
 dash.register_page(__name__, path='/database')
 
-layout = html.Div([
-    html.H2('ASSAS Database - Training Dataset Index'),
-    dbc.Alert('Search interface for the available ASSAS training datasets', color='primary', style={'textAlign': 'center'}),
-    html.Hr(),
-    html.Div([
-    dbc.Pagination(
-                id='pagination', 
-                first_last=True,
-                previous_next=True,
-                max_value=PAGE_COUNT, 
-                fully_expanded=False,
-                size='lg'                
-                )
-    ], style={'width': '100%','padding-left':'30%', 'padding-right':'25%'}),
-    html.Hr(),
-    html.Div([
-    dbc.Button(
-            'Download', 
-            id='download_selected', 
-            className='me-2', 
-            n_clicks=0, 
-            disabled=True,
+@lru_cache(maxsize=1)
+def page_header():
+    
+    # the components without table data never change, they are built once per worker
+    return (
+        html.H2('ASSAS Database - Training Dataset Index'),
+        dbc.Alert('Search interface for the available ASSAS training datasets', color='primary', style={'textAlign': 'center'}),
+        html.Hr(),
+    )
+
+@lru_cache(maxsize=1)
+def page_controls():
+    
+    return (
+        html.Hr(),
+        html.Div([
+        dbc.Button(
+                'Download', 
+                id='download_selected', 
+                className='me-2', 
+                n_clicks=0, 
+                disabled=True,
+            ),
+        dbc.Button(
+                'Refresh', 
+                id='reload_page', 
+                className='me-2', 
+                n_clicks=0, 
+                disabled=False,
+            ),
+        html.Div('Reloaded page', id='reload-contents')
+        ], style=CONTROLS_STYLE),
+        dcc.Download(id='download_button'),
+        html.Hr(),
+    )
+
+@lru_cache(maxsize=1)
+def page_footer():
+    
+    return (
+        html.Hr(),
+        dcc.Location(id='location'),
+        dcc.Download(id='download'),
+        html.Br(),
+        dcc.Checklist(
+            id='datatable-use-page-size',
+            options=[
+                {'label': ' Change entries per page', 'value': 'True'}
+            ],
+            value=['False']
         ),
-    dbc.Button(
-            'Refresh', 
-            id='reload_page', 
-            className='me-2', 
-            n_clicks=0, 
+        'Entries per page: ',
+        dcc.Input(
+            id='datatable-page-size',
+            type='number',
+            min=1,
+            max=PAGE_MAX_SIZE,
+            value=PAGE_SIZE,
+            placeholder=PAGE_SIZE,
+            style=PAGE_SIZE_STYLE_INACTIVE,
             disabled=False,
         ),
-    html.Div('Reloaded page', id='reload-contents')
-    ], style={'width': '100%','padding-left':'10%', 'padding-right':'25%'}),
-    dcc.Download(id='download_button'),
-    html.Hr(),
-    dash_table.DataTable(
-        id='datatable-paging-and-sorting',
-        columns=[
-        {'name': '_id', 'id': '_id', 'hideable': True},
-        {'name': 'Uuid', 'id': 'system_uuid', 'hideable': True},
-        {'name': 'Upload Uuid', 'id': 'system_upload_uuid', 'hideable': True},
-        {'name': 'Path', 'id': 'system_path', 'hideable': True},
-        {'name': 'Result', 'id': 'system_result', 'hideable': True},
-        {'name': 'Index', 'id': 'system_index', 'selectable': True},
-        {'name': 'Size', 'id': 'system_size', 'selectable': True},
-        {'name': 'Size hdf5', 'id': 'system_size_hdf5', 'selectable': True},
-        {'name': 'Date', 'id': 'system_date', 'selectable': True},
-        {'name': 'User', 'id': 'system_user', 'selectable': True},
-        {'name': 'File', 'id': 'system_download', 'selectable': True},
-        {'name': 'Status', 'id': 'system_status', 'selectable': True},
-        {'name': 'Name', 'id': 'meta_name', 'selectable': True},
-        ],
-        markdown_options={'html': True},
-        hidden_columns=['', '_id', 'system_uuid', 'system_upload_uuid', 'system_path', 'system_result'],
-        data=table_data.to_dict('records'),
-        style_cell={
-            'fontSize': 17,
-            'padding': '2px',
-            'textAlign': 'center'
-        },
-        merge_duplicate_headers= True,        
-        
-        style_header={
-            'backgroundColor': 'black',
-            'color': 'white',
-            'fontWeight': 'bold'
-        },
-        
-        style_data={
-            'backgroundColor': 'black',
-            'color': 'white'
-        },
-        
-        row_selectable='multi',
-        
-        page_current=0,
-        page_size=PAGE_SIZE,
-        page_action='none',
-                
-        filter_action='custom',
-        filter_query='',
-
-        sort_action='custom',
-        sort_mode='multi',
-        sort_by=[],
-        
-        is_focused=True,
-        
-        style_data_conditional=conditional_table_style(),        
-    ),
-    html.Hr(),
-    dcc.Location(id='location'),
-    dcc.Download(id='download'),
-    html.Br(),
-    dcc.Checklist(
-        id='datatable-use-page-size',
-        options=[
-            {'label': ' Change entries per page', 'value': 'True'}
-        ],
-        value=['False']
-    ),
-    'Entries per page: ',
-    dcc.Input(
-        id='datatable-page-size',
-        type='number',
-        min=1,
-        max=PAGE_MAX_SIZE,
-        value=PAGE_SIZE,
-        placeholder=PAGE_SIZE,
-        style={'color': 'grey'},
-        disabled=False,
-    ),
-    html.Div('Select a page', id='pagination-contents'),    
-],style=content_style())
+        html.Div('Select a page', id='pagination-contents'),
+    )
+
+def layout(
+    **kwargs
+):
+    
+    # built per request, so importing the page does not load the table
+    entries = len(get_table_data())
+    
+    return html.Div([
+        *page_header(),
+        html.Div([
+        dbc.Pagination(
+                    id='pagination', 
+                    first_last=True,
+                    previous_next=True,
+                    max_value=page_count(entries, PAGE_SIZE), 
+                    fully_expanded=False,
+                    size='lg'                
+                    )
+        ], style=PAGINATION_STYLE),
+        *page_controls(),
+        dash_table.DataTable(
+            id='datatable-paging-and-sorting',
+            columns=TABLE_COLUMNS,
+            markdown_options=TABLE_MARKDOWN_OPTIONS,
+            hidden_columns=TABLE_HIDDEN_COLUMNS,
+            # the rows of the first page are sent by update_table on page load
+            data=[],
+            style_cell=TABLE_CELL_STYLE,
+            merge_duplicate_headers= True,        
+            
+            style_header=TABLE_HEADER_STYLE,
+            
+            style_data=TABLE_DATA_STYLE,
+            
+            row_selectable='multi',
+            
+            page_current=0,
+            page_size=PAGE_SIZE,
+            page_action='none',
+                    
+            filter_action='custom',
+            filter_query='',
+    
+            sort_action='custom',
+            sort_mode='multi',
+            sort_by=[],
+            
+            is_focused=True,
+            
+            style_data_conditional=TABLE_CONDITIONAL_STYLE,        
+        ),
+        *page_footer(),
+    ],style=content_style())
 
 @callback(
     Output('reload-contents', 'children'),
@@ -161,28 +328,61 @@ def reload_page(
     clicks
 ):
     
-    logger.debug(f'reload page {clicks}')
+    logger.debug('reload page %s', clicks)
     
-    global table_data
-    table_data = AssasDatabaseManager(flask_app.config).get_all_database_entries()
+    # the initial call on page load reuses the cached table
+    if clicks:
+        get_table_data(reload=True)
    
-    return ''#f'table_data (shape {table_data.shape}, size {table_data.size})'
+    return ''
+
+# read size used when copying result files into a download archive
+ARCHIVE_BUFFER_SIZE = 1024 * 1024
+ARCHIVE_STORED_SUFFIXES = ('.h5', '.hdf5')
+ARCHIVE_COMPRESS_LEVEL = 1
+ARCHIVE_MISSING_NAME = 'MISSING.txt'
 
 def generate_archive(
     path_to_zip,
     file_path_list
 ):
     
+    missing = []
+    
     with ZipFile(path_to_zip, 'w') as zip_object:
         
         for file_path in file_path_list:
-            zip_object.write(file_path)
             
+            try:
+                if os.path.splitext(file_path)[1].lower() in ARCHIVE_STORED_SUFFIXES:
+                    # hdf5 results are compressed internally already, they are stored and
+                    # streamed in large blocks, from_file keeps the archive name and the
+                    # zip64 decision of ZipFile.write
+                    zip_info = ZipInfo.from_file(file_path)
+                    zip_info.compress_type = ZIP_STORED
+                    with open(file_path, 'rb') as source, zip_object.open(zip_info, 'w') as target:
+                        shutil.copyfileobj(source, target, ARCHIVE_BUFFER_SIZE)
+                else:
+                    # the fastest deflate level, most of the size gain at a fraction of the time
+                    zip_object.write(file_path, compress_type=ZIP_DEFLATED, compresslevel=ARCHIVE_COMPRESS_LEVEL)
+            except FileNotFoundError:
+                logger.warning('skip missing file %s', file_path)
+                missing.append(file_path)
+        
+        # the archive lists the files it lacks instead of looking complete
+        if missing:
+            zip_object.writestr(ARCHIVE_MISSING_NAME, 'Files not found:\n' + '\n'.join(missing) + '\n')
+    
+    if len(missing) == len(file_path_list):
+        logger.warning('ZIP file %s not created, no file found', path_to_zip)
+        os.remove(path_to_zip)
+        return None
+    
     if os.path.exists(path_to_zip):
-        logger.info(f'ZIP file %s created {path_to_zip}')
+        logger.info('ZIP file %s created', path_to_zip)
         return path_to_zip
     else:
-        logger.info(f'ZIP file %s not created {path_to_zip}')
+        logger.info('ZIP file %s not created', path_to_zip)
         return None       
 
 @callback(
@@ -202,22 +402,23 @@ def start_download(
         return dash.no_update    
     
     uuid = str(uuid4())
-    logger.info(f'started download (id = {uuid})')
+    logger.info('started download (id = %s)', uuid)
     
     download_folder = '/root/tmp'
-    if not os.path.exists(download_folder):
-        logger.info(f'create {download_folder}')
-        os.makedirs(download_folder)
+    os.makedirs(download_folder, exist_ok=True)
         
     selected_data = [data[i] for i in rows]    
     file_list = [data_item['system_result'] for data_item in selected_data]
     
     zip_file = download_folder + '/download_' + uuid + '.zip'
-    logger.info(f'generate archive {zip_file}')
+    logger.info('generate archive %s', zip_file)
     
     zip_file = generate_archive(zip_file, file_list)
     
-    logger.debug(f'clicks {clicks} rows {str(rows)} files {file_list} zip {zip_file}')
+    logger.debug('clicks %s rows %s files %s zip %s', clicks, rows, file_list, zip_file)
+    
+    if zip_file is None:
+        return dash.no_update
     
     return dcc.send_file(zip_file)
 
@@ -244,30 +445,337 @@ def split_filter_part(
     filter_part
 ):
     
-    for operator_type in operators:
-        for operator in operator_type:
-            if operator in filter_part:
-                name_part, value_part = filter_part.split(operator, 1)
-                name = name_part[name_part.find('{') + 1: name_part.rfind('}')]
+    match = FILTER_PATTERN.search(filter_part)
+    
+    if match is None:
+        return [None] * 4
+    
+    value_part = match.group('value').strip()
+    
+    if len(value_part) == 0:
+        return [None] * 4
+    
+    # the value stays a string here, it is converted to the dtype of the
+    # filtered column in coerce_filter_value
+    v0 = value_part[0]
+    if (v0 == value_part[-1] and v0 in ("'", '"', '`')):
+        value = value_part[1: -1].replace('\\' + v0, v0)
+    else:
+        value = value_part
+    
+    # None without a prefix, each operator then uses its default case handling
+    case_sensitive = {'s': True, 'i': False}.get(match.group('case'))
+    
+    return match.group('name'), OPERATOR_NAMES[match.group('operator')], value, case_sensitive
 
-                value_part = value_part.strip()
-                v0 = value_part[0]
-                if (v0 == value_part[-1] and v0 in (''', ''', '`')):
-                    value = value_part[1: -1].replace('\\' + v0, v0)
-                else:
-                    try:
-                        value = float(value_part)
-                    except ValueError:
-                        value = value_part
+@lru_cache(maxsize=128)
+def parse_filter_query(
+    filter_query
+):
+    
+    # page changes and sorting reuse the parsed clauses of an unchanged filter query
+    clauses = []
+    
+    for filter_part in filter_query.split(' && '):
+        col_name, operator, filter_value, case_sensitive = split_filter_part(filter_part)
+        
+        if operator is not None:
+            clauses.append((col_name, operator, filter_value, case_sensitive))
+    
+    # cheap and usually selective clauses first, so the combined mask can
+    # become empty before the substring scans run
+    clauses.sort(key=lambda clause: FILTER_COSTS[clause[1]])
+    
+    return tuple(clauses)
+
+def coded_mask(
+    codes,
+    values,
+    operator,
+    filter_value,
+    lowered_values=None,
+    case_sensitive=None
+):
+    
+    # lowered values are only passed for text, the categories of categorical columns are checked here
+    if lowered_values is None and pd.api.types.infer_dtype(values, skipna=True) != 'string':
+        if operator in ('contains', 'datestartswith'):
+            # like in filter_mask, these operators only apply to text
+            return None
+        # other values ignore the case prefix, as the NumPy columns in filter_mask
+        case_sensitive = None
+    
+    if operator in ('eq', 'ne') and case_sensitive is not False:
+        code = values.get_loc(filter_value) if filter_value in values else -2
+        mask = codes == code
+        return mask if operator == 'eq' else ~mask
+    
+    if operator == 'contains' and case_sensitive:
+        # the s prefix keeps the literal search case-sensitive
+        matches = values.str.contains(str(filter_value), regex=False)
+    elif operator == 'contains':
+        # case-insensitive literal search by default, the needle is lowercased once per clause
+        if lowered_values is None:
+            lowered_values = values.str.lower()
+        matches = lowered_values.str.contains(str(filter_value).lower(), regex=False)
+    elif operator == 'datestartswith':
+        # this is a simplification of the front-end filtering logic,
+        # only works with complete fields in standard format
+        matches = values.str.startswith(filter_value)
+    else:
+        if case_sensitive is False:
+            # the i prefix compares the lowercased values and filter value
+            if lowered_values is None:
+                lowered_values = values.str.lower()
+            values = lowered_values
+            filter_value = str(filter_value).lower()
+        matches = getattr(values.to_series(), operator)(filter_value)
+    
+    # evaluate the predicate once per distinct value and gather it by code,
+    # the appended entry maps the missing value code -1 to False, or to True
+    # for ne as a missing value differs from any filter value
+    lookup = np.append(np.asarray(matches, dtype=bool), operator == 'ne')
+    
+    return lookup[codes]
+
+def factorize_column(
+    table,
+    col_name
+):
+    
+    entry = table.factorized.get(col_name)
+    
+    if entry is None:
+        codes, uniques = pd.factorize(table.dataframe[col_name])
+        uniques = pd.Index(uniques)
+        is_text = pd.api.types.infer_dtype(uniques, skipna=True) == 'string'
+        lowered = uniques.str.lower() if is_text else None
+        entry = table.factorized[col_name] = (codes, uniques, lowered, is_text)
+    
+    return entry
 
-                # word operators need spaces after them in the filter string,
-                # but we don't want these later
-                return name, operator_type[0].strip(), value
+def date_prefix_range(
+    filter_value
+):
+    
+    # '2024', '2024-03' and '2024-03-15' select a whole year, month or day
+    if DATE_PREFIX_PATTERN.match(filter_value) is None:
+        return None
+    
+    try:
+        start = pd.Timestamp(filter_value)
+    except ValueError:
+        return None
+    
+    if len(filter_value) == 4:
+        end = start + pd.DateOffset(years=1)
+    elif len(filter_value) == 7:
+        end = start + pd.DateOffset(months=1)
+    else:
+        end = start + pd.DateOffset(days=1)
+    
+    return start.to_datetime64(), end.to_datetime64()
+
+def date_prefix_mask(
+    table,
+    col_name,
+    codes,
+    uniques,
+    date_range
+):
+    
+    # the distinct values are those of factorize_column on the same table
+    dates = table.dates.get(col_name)
+    
+    if dates is None:
+        dates = pd.to_datetime(uniques, format=DATE_COLUMNS[col_name], errors='coerce').to_numpy()
+        table.dates[col_name] = dates
+    
+    # unparsable dates are NaT and never inside the range
+    matches = (dates >= date_range[0]) & (dates < date_range[1])
+    
+    return np.append(matches, False)[codes]
+
+def coerce_filter_value(
+    column,
+    operator,
+    filter_value
+):
+    '''Convert the filter value to the dtype of the column, None if the clause does not apply to it.'''
+    
+    dtype = column.dtype
+    if isinstance(dtype, pd.CategoricalDtype):
+        dtype = dtype.categories.dtype
+    
+    if pd.api.types.is_numeric_dtype(dtype) and not pd.api.types.is_bool_dtype(dtype):
+        if operator not in COMPARISON_OPERATORS:
+            return None
+        try:
+            return float(filter_value)
+        except ValueError:
+            return None
+    
+    if pd.api.types.is_datetime64_any_dtype(dtype):
+        if operator not in COMPARISON_OPERATORS:
+            return None
+        try:
+            return pd.Timestamp(filter_value)
+        except ValueError:
+            return None
+    
+    return filter_value
+
+def filter_mask(
+    table,
+    col_name,
+    operator,
+    filter_value,
+    case_sensitive=None
+):
+    '''Boolean row mask of one filter clause, None if the clause is skipped.'''
+    
+    dataframe = table.dataframe
+    
+    if col_name not in dataframe.columns:
+        return None
+    
+    column = dataframe[col_name]
+    filter_value = coerce_filter_value(column, operator, filter_value)
+    
+    if filter_value is None:
+        return None
+    
+    if isinstance(column.dtype, pd.CategoricalDtype):
+        return coded_mask(column.cat.codes.to_numpy(), column.cat.categories, operator, filter_value, case_sensitive=case_sensitive)
+    
+    if pd.api.types.is_object_dtype(column.dtype) or isinstance(column.dtype, pd.StringDtype):
+        codes, uniques, lowered, is_text = factorize_column(table, col_name)
+        if is_text:
+            if operator == 'datestartswith' and col_name in DATE_COLUMNS:
+                date_range = date_prefix_range(filter_value)
+                if date_range is not None:
+                    return date_prefix_mask(table, col_name, codes, uniques, date_range)
+            return coded_mask(codes, uniques, operator, filter_value, lowered, case_sensitive)
+        if operator not in ('eq', 'ne'):
+            return None
+    
+    if operator not in COMPARISON_OPERATORS:
+        return None
+    
+    if isinstance(column.dtype, np.dtype) and column.dtype.kind in 'iuf':
+        return COMPARISON_OPERATORS[operator](column.to_numpy(), filter_value)
+    
+    # these operators match pandas series operator method names
+    return getattr(column, operator)(filter_value).to_numpy()
+
+def sort_positions(
+    dataframe,
+    positions,
+    sort_by,
+    stop
+):
+    
+    # sort the key columns of the filtered rows only, indexed by their positions
+    columns = [col['column_id'] for col in sort_by]
+    keys = dataframe[columns].iloc[positions].set_axis(positions)
+    
+    if len(columns) == 1 and stop < len(keys) and pd.api.types.is_numeric_dtype(keys[columns[0]]):
+        # partial sort, only the rows up to the end of the requested page are ordered,
+        # ties are kept in row order
+        if sort_by[0]['direction'] == 'asc':
+            head = keys[columns[0]].nsmallest(stop, keep='first')
+        else:
+            head = keys[columns[0]].nlargest(stop, keep='first')
+        
+        # missing values are dropped by nsmallest/nlargest but sorted last otherwise
+        if len(head) == stop:
+            return head.index.to_numpy()
+    
+    # a stable sort keeps ties in row order like nsmallest/nlargest above,
+    # so pages from the partial and the full sort line up
+    keys = keys.sort_values(
+        columns,
+        ascending=[
+            col['direction'] == 'asc'
+            for col in sort_by
+        ],
+        kind='stable'
+    )
+    
+    return keys.index.to_numpy()
+
+def cache_positions(
+    table,
+    key,
+    positions
+):
+    
+    positions.flags.writeable = False
+    
+    if len(table.positions) >= FILTER_CACHE_SIZE:
+        table.positions.popitem(last=False)
+    table.positions[key] = positions
+    
+    return positions
+
+def filter_positions(
+    table,
+    filter_query
+):
+    
+    positions = table.positions.get(filter_query)
+    
+    if positions is not None:
+        return positions
+    
+    # combine all clauses into one boolean mask and select the rows only once
+    mask = np.ones(len(table.dataframe), dtype=bool)
+    
+    for col_name, operator, filter_value, case_sensitive in parse_filter_query(filter_query):
+        clause_mask = filter_mask(table, col_name, operator, filter_value, case_sensitive)
+        
+        if clause_mask is None:
+            logger.debug('skip filter clause %s %s %s', col_name, operator, filter_value)
+            continue
+        
+        mask &= clause_mask
+        
+        if not mask.any():
+            break
+    
+    return cache_positions(table, filter_query, np.flatnonzero(mask))
 
-    return [None] * 3
+def sorted_positions(
+    table,
+    filter_query,
+    positions,
+    sort_by,
+    stop
+):
+    
+    key = (filter_query, tuple((col['column_id'], col['direction']) for col in sort_by))
+    ordered = table.positions.get(key)
+    
+    # a partial sort covers the pages up to its length
+    if ordered is not None and len(ordered) >= min(stop, len(positions)):
+        return ordered
+    
+    return cache_positions(table, key, sort_positions(table.dataframe, positions, sort_by, stop))
+
+def page_records(
+    page_data
+):
+    
+    # convert column by column, to_dict('records') boxes every cell separately,
+    # missing values become None like there, tolist() would keep pd.NA which orjson cannot encode
+    columns = page_data.columns.tolist()
+    values = [page_data[column].to_numpy(dtype=object, na_value=None).tolist() for column in columns]
+    
+    return [dict(zip(columns, row)) for row in zip(*values)]
 
 @callback(
     Output('datatable-paging-and-sorting', 'data'),
+    Output('pagination', 'max_value'),
     Input('datatable-paging-and-sorting', 'page_current'),
     Input('datatable-paging-and-sorting', 'page_size'),
     Input('datatable-paging-and-sorting', 'sort_by'),
@@ -279,37 +787,22 @@ def update_table(
     filter
 ):
     
-    filtering_expressions = filter.split(' && ')
+    table = get_table_state()
     
-    dff = table_data
+    # only the row positions are carried along, the rows of the page are taken at the end
+    positions = filter_positions(table, filter)
     
-    for filter_part in filtering_expressions:
-        col_name, operator, filter_value = split_filter_part(filter_part)
-
-        if operator in ('eq', 'ne', 'lt', 'le', 'gt', 'ge'):
-            # these operators match pandas series operator method names
-            dff = dff.loc[getattr(dff[col_name], operator)(filter_value)]
-        elif operator == 'contains':
-            dff = dff.loc[dff[col_name].str.contains(filter_value)]
-        elif operator == 'datestartswith':
-            # this is a simplification of the front-end filtering logic,
-            # only works with complete fields in standard format
-            dff = dff.loc[dff[col_name].str.startswith(filter_value)]
-
-    if len(sort_by):
-        dff = dff.sort_values(
-            [col['column_id'] for col in sort_by],
-            ascending=[
-                col['direction'] == 'asc'
-                for col in sort_by
-            ],
-            inplace=False
-        )
-
     page = page_current
     size = page_size
     
-    return dff.iloc[page * size: (page + 1) * size].to_dict('records')
+    # counted before sorting, the partial sort only keeps the rows up to the requested page
+    entries = len(positions)
+    
+    if len(sort_by):
+        positions = sorted_positions(table, filter, positions, sort_by, (page + 1) * size)
+    
+    # the page count follows the filtered rows and is returned with them
+    return page_records(table.dataframe.iloc[positions[page * size: (page + 1) * size]]), page_count(entries, size)
 
 @callback(
     Output('datatable-paging-and-sorting', 'page_size'),
@@ -320,71 +813,53 @@ def update_page_size(
     page_size_value
 ):
     
-    logger.debug(f'update page size, use page size {use_page_size} page size value {page_size_value}')
+    logger.debug('update page size, use page size %s page size value %s', use_page_size, page_size_value)
     
     if len(use_page_size) == 0 or page_size_value is None:
         return PAGE_SIZE
     
     return page_size_value
 
-@callback(
+# the page label and the page index of the table are derived in the browser,
+# see assets/database.js
+clientside_callback(
+    ClientsideFunction(namespace='database', function_name='change_page'),
     Output('pagination-contents', 'children'),
     Input('pagination', 'active_page'),
     Input('pagination', 'max_value'))
-def change_page(
-    page, 
-    value
-):
-    
-    logger.debug(f'page {page} value {value}')    
-    
-    if page:        
-        return f'Page selected: {page}/{value}'
-    
-    return f'Page selected: 1/{value}'
 
-@callback(
+clientside_callback(
+    ClientsideFunction(namespace='database', function_name='change_page_table'),
     Output('datatable-paging-and-sorting', 'page_current'),
     Input('pagination', 'active_page'))
-def change_page_table(
-    page
-):
-    
-    logger.debug(f'page {page}')
-    
-    if page:        
-        return (page - 1)    
-    return 0
 
 @callback(
-    Output('pagination', 'max_value'),
     Output('datatable-page-size', 'style'),
     Input('datatable-use-page-size', 'value'),
     Input('datatable-page-size', 'value'))
-def update_page_count(
+def update_page_size_style(
     use_page_size, 
     page_size_value
 ):
     
-    logger.debug(f'update page count, use page size {use_page_size} page size value {page_size_value}')
+    logger.debug('update page size style, use page size %s page size value %s', use_page_size, page_size_value)
     
     if len(use_page_size) > 1 and page_size_value is not None:                
-        return int(len(table_data) / page_size_value) + 1,{'color': 'black'}
-    
-    if page_size_value is None:
-        return int(len(table_data) / PAGE_SIZE) + 1,{'color': 'grey'}      
+        return PAGE_SIZE_STYLE_ACTIVE
     
-    return int(len(table_data) / PAGE_SIZE) + 1,{'color': 'grey'}
+    return PAGE_SIZE_STYLE_INACTIVE
 
 @callback(
     Output('download', 'data'),
+    Output('location', 'href'),
     Input('datatable-paging-and-sorting', 'active_cell'),
     State('datatable-paging-and-sorting', 'derived_viewport_data'))
-def cell_clicked_download(
+def cell_clicked(
     active_cell, 
     data
 ):
     
+    # one callback for both clickable columns, the active cell is sent to the server only once
     if active_cell:
         
         row = active_cell['row']
@@ -394,31 +869,12 @@ def cell_clicked_download(
         if col == 'system_download':
             
             file_to_send = row_data['system_result']
-            logger.debug(f'File to send: {file_to_send}')
+            logger.debug('File to send: %s', file_to_send)
             
-            return dcc.send_file(file_to_send)
-        
-        else:
-            
-            return dash.no_update
-        
-@callback(
-    Output('location', 'href'),
-    Input('datatable-paging-and-sorting', 'active_cell'),
-    State('datatable-paging-and-sorting', 'derived_viewport_data'))
-def cell_clicked_details(
-    active_cell,
-    data
-):
-    
-    if active_cell:
-        
-        row = active_cell['row']
-        row_data = data[row]
-        col = active_cell['column_id']
+            return dcc.send_file(file_to_send), dash.no_update
         
         if col == 'meta_name':
             url = '/assas_app/details/' + str(row_data['_id'])
-            return url
-        else:
-            return dash.no_update
\ No newline at end of file
+            return dash.no_update, url
+    
+    return dash.no_update, dash.no_update
@@ -2,10 +2,9 @@ import dash
 import dash_bootstrap_components as dbc
 import logging
 
-from flask import current_app as flask_app
 from dash import html
-from assasdb import AssasDatabaseManager
 from ..components import content_style
+from ... import get_database_manager
 
 logger = logging.getLogger('assas_app')
 
@@ -50,7 +49,7 @@ def layout(report_id=None):
             html.Div('The content is generated for each _id.'),
             ],style = content_style())
     else:
-        database_manager = AssasDatabaseManager(flask_app.config)
+        database_manager = get_database_manager()
         document = database_manager.get_database_entry_by_id(report_id)
         logger.info('Found document %s' % (document))
     
@@ -7,7 +7,8 @@ from urllib.parse import urlencode
 from flask import redirect, render_template, send_file, request, jsonify
 from flask import current_app as app
 
-from assasdb import AssasDatabaseManager, AssasHdf5DatasetHandler
+from assasdb import AssasHdf5DatasetHandler
+from . import get_database_manager
 
 logger = logging.getLogger('assas_app')
 
@@ -27,7 +28,7 @@ def get_data_file():
     args = request.args
     system_uuid = uuid.UUID(args.get('uuid', type=str))
     
-    manager = AssasDatabaseManager(app.config)
+    manager = get_database_manager()
     document = manager.get_database_entry_by_uuid(system_uuid)
     filepath = document['system_result']
     
@@ -49,14 +50,21 @@ def query_data():
    
     logger.info(f'{system_uuid} {variable} {tstart} {tend}')
     
-    manager = AssasDatabaseManager(app.config)
+    manager = get_database_manager()
     document = manager.get_database_entry_by_uuid(system_uuid)
     filepath = document['system_result']
     
     logger.info(f'Handle request of {filepath}')
     array = AssasHdf5DatasetHandler.get_variable_data_from_hdf5(filepath, variable)
     
-    return jsonify({'data_shape': np.shape(array), 'data': array.tolist()})
+    # the orjson provider of the app encodes native numeric arrays directly, without a nested
+    # python list, scalars, strings and non-native byte orders keep the tolist conversion
+    if array.ndim > 0 and array.dtype.isnative and array.dtype.kind in 'biuf':
+        data = np.ascontiguousarray(array)
+    else:
+        data = array.tolist()
+    
+    return jsonify({'data_shape': np.shape(array), 'data': data})
 
 @app.route('/index')
 def index():
@@ -1,10 +1,13 @@
 
+import os
 import logging
 import pandas
 import json
 import uuid
 import bson
 
+from functools import lru_cache
+from flask import current_app
 from flask_login import UserMixin
 from werkzeug.security import generate_password_hash
 from pymongo import MongoClient
@@ -94,11 +97,22 @@ class User(UserMixin):
     def is_authenticated(self):
         return True
 
+@lru_cache(maxsize=1)
+def mongo_client(connection_string):
+    
+    # the client is thread-safe and pools its connections, it is created once per process
+    # on first use instead of for every user lookup
+    return MongoClient(connection_string)
+
+# the client is not fork-safe, wsgi.py already uses it at import, so a worker forked
+# from a preloading server creates its own instead of inheriting the one of the parent
+os.register_at_fork(after_in_child=mongo_client.cache_clear)
+
 class AssasUserManager:
 
     def __init__(self):
         
-        self.client = MongoClient('mongodb://localhost:27017/')
+        self.client = mongo_client(current_app.config['CONNECTIONSTRING'])
 
         self.db_handle = self.client['assas']
         self.user_collection = self.db_handle['user']
@@ -0,0 +1,106 @@
+import dash
+import numpy as np
+import pandas as pd
+import pytest
+
+# the page registers itself, which needs an app to exist
+dash.Dash(__name__)
+
+from flask_app.dash_app.pages.database import (
+    TableState,
+    filter_mask,
+    parse_filter_query,
+    split_filter_part,
+)
+
+@pytest.fixture
+def table():
+    
+    dataframe = pd.DataFrame({
+        'system_index': [3, 1, 2, 1],
+        'system_size': [1.5, np.nan, 3.0, 0.5],
+        'meta_name': pd.array(['Alpha', 'beta', None, 'alphabet'], dtype='string[pyarrow]'),
+        'system_user': pd.Categorical(['Admin', 'user', 'admin', None]),
+        'system_status': pd.Categorical([1.0, 2.0, 1.0, np.nan]),
+        'system_date': pd.array(
+            ['03/01/2024, 12:00:00', '04/01/2024, 12:00:00', '03/31/2024, 23:59:59', None],
+            dtype='string[pyarrow]'
+        ),
+    })
+    
+    return TableState(dataframe)
+
+def mask(table, filter_part):
+    
+    col_name, operator, filter_value, case_sensitive = split_filter_part(filter_part)
+    result = filter_mask(table, col_name, operator, filter_value, case_sensitive)
+    
+    return None if result is None else result.tolist()
+
+@pytest.mark.parametrize('filter_part, expected', [
+    ('{system_index} >= 2', ('system_index', 'ge', '2', None)),
+    ('{system_index} ge 2', ('system_index', 'ge', '2', None)),
+    ('{system_index} > 2', ('system_index', 'gt', '2', None)),
+    ('{meta_name} contains al', ('meta_name', 'contains', 'al', None)),
+    ('{meta_name} scontains Al', ('meta_name', 'contains', 'Al', True)),
+    ('{meta_name} ieq alpha', ('meta_name', 'eq', 'alpha', False)),
+    ('{meta_name} = "a \\"b\\""', ('meta_name', 'eq', 'a "b"', None)),
+    ('{system_date} datestartswith 2024-03', ('system_date', 'datestartswith', '2024-03', None)),
+])
+def test_split_filter_part(filter_part, expected):
+    
+    assert tuple(split_filter_part(filter_part)) == expected
+
+@pytest.mark.parametrize('filter_part', ['system_index >= 2', '{system_index} >=', '{meta_name} containsal'])
+def test_split_filter_part_invalid(filter_part):
+    
+    assert list(split_filter_part(filter_part)) == [None] * 4
+
+def test_parse_filter_query_orders_by_cost():
+    
+    clauses = parse_filter_query('{meta_name} contains a && invalid && {system_index} eq 1')
+    
+    assert clauses == (
+        ('system_index', 'eq', '1', None),
+        ('meta_name', 'contains', 'a', None),
+    )
+
+def test_numeric_columns(table):
+    
+    assert mask(table, '{system_index} >= 2') == [True, False, True, False]
+    assert mask(table, '{system_index} eq 1') == [False, True, False, True]
+    # missing values never compare true
+    assert mask(table, '{system_size} lt 2') == [True, False, False, True]
+
+def test_text_columns(table):
+    
+    assert mask(table, '{meta_name} contains AL') == [True, False, False, True]
+    assert mask(table, '{meta_name} scontains Al') == [True, False, False, False]
+    assert mask(table, '{meta_name} eq alpha') == [False, False, False, False]
+    assert mask(table, '{meta_name} ieq alpha') == [True, False, False, False]
+    assert mask(table, '{meta_name} ne beta') == [True, False, True, True]
+
+def test_category_columns(table):
+    
+    assert mask(table, '{system_user} eq admin') == [False, False, True, False]
+    assert mask(table, '{system_user} ieq admin') == [True, False, True, False]
+    assert mask(table, '{system_user} icontains ADM') == [True, False, True, False]
+    # the case prefix is ignored on numeric categories
+    assert mask(table, '{system_status} eq 1') == [True, False, True, False]
+    assert mask(table, '{system_status} ieq 1') == [True, False, True, False]
+
+def test_date_columns(table):
+    
+    assert mask(table, '{system_date} datestartswith 2024-03') == [True, False, True, False]
+    assert mask(table, '{system_date} datestartswith 2024') == [True, True, True, False]
+    assert mask(table, '{system_date} datestartswith 03/01') == [True, False, False, False]
+
+@pytest.mark.parametrize('filter_part', [
+    '{missing} eq 1',
+    '{system_index} eq one',
+    '{system_index} contains 1',
+    '{system_status} contains 1',
+])
+def test_invalid_clauses_are_skipped(table, filter_part):
+    
+    assert mask(table, filter_part) is None
@@ -33,7 +33,8 @@ login_manager = LoginManager(app)
 login_manager.init_app(app)
 login_manager.login_view = '/index'
 
-create_admin_user()
+with app.app_context():
+    create_admin_user()
 
 @login_manager.user_loader
 def load_user(username):